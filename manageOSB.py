@@ -26,19 +26,22 @@ import os
 import os.path
 import sys
 import random
+import re
 
+from itertools import izip_longest
 from time import strftime, localtime
 
 from java.util import Collections
+from java.util import HashSet
 from java.util import Properties
 
 from java.io import File
 from java.io import FileInputStream
 
-from xml.dom.minidom import parseString
 from com.bea.wli.sb.util import EnvValueTypes
 from com.bea.wli.sb.util import Refs
 from com.bea.wli.config import Ref
+from com.bea.wli.config.env import EnvValueQuery
 from com.bea.wli.config.mbeans import SessionMBean
 from com.bea.wli.sb.management.configuration import SessionManagementMBean
 from com.bea.wli.sb.management.configuration import ALSBConfigurationMBean
@@ -76,36 +79,41 @@ def undeploy_osb_prj(connection_info):
             log("ERROR", "List of project names must contain at least one name.")
             return
 
-    prj_names = prj_names.split(" ")
+    # Process each project once, even if it is listed more than once
+    prj_names = unique_list(prj_names.split())
 
-    log("INFO", "Projects to delete: " + ", ".join(prj_names) + ".")
+    log("INFO", "Projects to delete: %s.", ", ".join(prj_names))
     report = []
     report_title = "REPORT: Delete OSB projects from '" + connection_info["url"] + "'"
     column_names = ("OBJECT_TYPE", "OBJECT_NAME", "STATUS")
 
     for prj_name in prj_names:
-        if not prj_name:
-            continue
-        prj_name = prj_name.strip()
         print("")
         print("=========================================================")
-        log("INFO", "Processing project '" + prj_name + "'...")
+        log("INFO", "Processing project '%s'...", prj_name)
 
         # Get a report on the project [Business/Proxy, URI, Work manager]
         try:
             prj_details_report = get_prj_details(prj_name)
         except:
-            log("ERROR", str(sys.exc_info()[0]) + " " + str(sys.exc_info()[1]))
-            log("ERROR", "Error when getting project details for '" + prj_name + "'. Try to reconnect")
+            exc_type, exc_value = sys.exc_info()[:2]
+            log("ERROR", "%s %s", exc_type, exc_value)
+            log("ERROR", "Error when getting project details for '%s'. Try to reconnect", prj_name)
             return
         
         if prj_details_report == "Not found":
-            log("WARNING", "OSB project '" + prj_name + "' could not be found on '" + connection_info["url"] + "'.")
+            log("WARNING", "OSB project '%s' could not be found on '%s'.", prj_name, connection_info["url"])
             print("")
             report.append(["OSB project", prj_name, "Not found"])
             continue
+        elif prj_details_report == "Failed":
+            # Without the details the project's JMS queues and work managers cannot be cleaned up, so keep it
+            log("ERROR", "Could not get details of OSB project '%s'. The project was not deleted.", prj_name)
+            print("")
+            report.append(["OSB project", prj_name, "Failed"])
+            continue
         elif prj_details_report == "Project is empty":
-            log("WARNING", "OSB project '" + prj_name + "' was found on '" + connection_info["url"] + "', but is empty.")
+            log("WARNING", "OSB project '%s' was found on '%s', but is empty.", prj_name, connection_info["url"])
             print("")
             report.append(["OSB project", prj_name, "Project is empty"])
         else:
@@ -113,44 +121,41 @@ def undeploy_osb_prj(connection_info):
             prj_details_column_names = ("SERVICE_PATH", "ENBLD#", "URI", "WORK_MANAGER")
             create_report(prj_details_report_title, prj_details_report, prj_details_column_names, is_sorted=True)
 
-        session_name = connection_info["username"] + "_" + str(System.currentTimeMillis())
+        session_name = new_session_name(connection_info)
 
         try:
-            log("INFO", "Creating session '" + session_name + "'...")
-            session_mbean = findService(SessionManagementMBean.NAME, SessionManagementMBean.TYPE)
+            log("INFO", "Creating session '%s'...", session_name)
+            session_mbean = get_session_mbean()
             session_mbean.createSession(session_name)
-            log("INFO", "Created session '" + session_name + "'.")
+            log("INFO", "Created session '%s'.", session_name)
             prj_ref = Ref(Ref.PROJECT_REF, Ref.DOMAIN, prj_name)
-            alsb_mbean = findService("ALSBConfiguration." + str(session_name),
-                                     "com.bea.wli.sb.management.configuration.ALSBConfigurationMBean")
+            alsb_mbean = find_mbean("ALSBConfiguration." + str(session_name),
+                                    "com.bea.wli.sb.management.configuration.ALSBConfigurationMBean")
             
             if alsb_mbean.exists(prj_ref):
-                if is_standalone:
-                    del_prj_choice = "Y"
-                else:
-                    del_prj_choice = raw_input("[INPUT] Do you really want to delete project '" + prj_name + "', Y/N [Y]? ")
-                
-                if del_prj_choice.upper() == "Y" or del_prj_choice.strip() == "":
-                    log("INFO", "Deleting OSB project '" + prj_name + "'...")
+                if confirm("[INPUT] Do you really want to delete project '" + prj_name + "', Y/N [Y]? "):
+                    log("INFO", "Deleting OSB project '%s'...", prj_name)
                     alsb_mbean.delete(Collections.singleton(prj_ref))
-                    log("INFO", "Project '" + prj_name + "' deleted. Activating session '" + session_name + "'...")
+                    log("INFO", "Project '%s' deleted. Activating session '%s'...", prj_name, session_name)
                     session_mbean.activateSession(session_name, "Deleted '" + prj_name + "'")
+                    forget_session_mbeans(session_name)
                     report.append(["OSB project", prj_name, "Deleted"])
                     print("")
                 else:
-                    log("INFO", "OSB project '" + prj_name + "' was skipped by user")
+                    log("INFO", "OSB project '%s' was skipped by user", prj_name)
                     report.append(["OSB project", prj_name, "Skipped by user"])
                     continue
             else:
-                log("WARNING", "OSB project '" + prj_name + "' could not be found on '" + connection_info["url"] + "'.")
+                log("WARNING", "OSB project '%s' could not be found on '%s'.", prj_name, connection_info["url"])
                 print("")
                 report.append(["OSB project", prj_name, "Not found"])
                 continue  # to the next prj_name
 
         except:
             report.append(["OSB project", prj_name, "Failed"])
-            log("ERROR", str(sys.exc_info()[0]) + " " + str(sys.exc_info()[1]))
-            log("WARNING", "Error when deleting project '" + prj_name + "'. Discarding session '" + session_name + "'...")
+            exc_type, exc_value = sys.exc_info()[:2]
+            log("ERROR", "%s %s", exc_type, exc_value)
+            log("WARNING", "Error when deleting project '%s'. Discarding session '%s'...", prj_name, session_name)
             discard_session(session_mbean, session_name)
             print("")
             # create_report(report_title, report, column_names, is_sorted=True)
@@ -165,20 +170,13 @@ def undeploy_osb_prj(connection_info):
                 for row in prj_details_report:
                     jms_uri = str(row[2])  # row[2] represents uri in the array of row
                     if jms_uri and "jms://" in jms_uri:
-                        # get queue name from jms_uri
-                        jms_uri = jms_uri.split("/")
-                        qjndi = jms_uri[-1]
-                        queue_name = qjndi.split(".")[-1]
+                        # get queue name from jms_uri, e.g. jms://host:port/cf.jndi/jms.QueueName -> QueueName
+                        qjndi = jms_uri.rpartition("/")[2]
+                        queue_name = qjndi.rpartition(".")[2]
                         jms_queues.append(queue_name)
                 
-                # Leave only unique names
-                jms_queues_unique = []  # Just another workaround as set() is not available
-                for queue_name in jms_queues:
-                    if queue_name not in jms_queues_unique:
-                        jms_queues_unique.append(queue_name)
-                
-                for queue_name in jms_queues_unique:
-                    log("INFO", "The project was using queue '" + queue_name + "'.")
+                for queue_name in unique_list(jms_queues):
+                    log("INFO", "The project was using queue '%s'.", queue_name)
                     print("")
                     queues_report = delete_queue(queue_name)
                     if queues_report:
@@ -187,7 +185,8 @@ def undeploy_osb_prj(connection_info):
 
             except:
                 log("ERROR", "Error while processing JMS queues")
-                log("ERROR", str(sys.exc_info()[0]) + " " + str(sys.exc_info()[1]))
+                exc_type, exc_value = sys.exc_info()[:2]
+                log("ERROR", "%s %s", exc_type, exc_value)
                 # log("INFO", "Script execution report:")
                 # create_report(report_title, report, column_names, is_sorted=True)
                 # print("")
@@ -200,34 +199,23 @@ def undeploy_osb_prj(connection_info):
                     if wm_name and wm_name not in("SBDefaultResponseWorkManager", "None", "default"):
                         wm_names.append(wm_name)
                 
-                # Leave only unique names
-                wm_names_unique = []  # Just another workaround as set() is not available
-                for wm_name in wm_names:
-                    if wm_name not in wm_names_unique:
-                        wm_names_unique.append(wm_name)
-                
-                for wm_name in wm_names_unique:
+                for wm_name in unique_list(wm_names):
                     print("")
                     
-                    if is_standalone:
-                        del_wm_choice = "Y"
-                    else:
-                        del_wm_choice = raw_input("[INPUT] The project was using Work Manager '"
-                                            + wm_name + "'. Delete it, Y/N [Y]? ")
-                    
-                    if del_wm_choice.upper() == "Y" or del_wm_choice.strip() == "":
-                        log("INFO", "Processing work manager '" + wm_name + "'...")
+                    if confirm("[INPUT] The project was using Work Manager '" + wm_name + "'. Delete it, Y/N [Y]? "):
+                        log("INFO", "Processing work manager '%s'...", wm_name)
                         wm_report = delete_work_manager(wm_name)
                         if wm_report:
                             for row in wm_report:
                                 report.append(row)
                     else:
-                        log("INFO", "Deleting Work manager '" + wm_name + "' was skipped by the user.")
+                        log("INFO", "Deleting Work manager '%s' was skipped by the user.", wm_name)
                         report.append(["Work manager", wm_name, "Skipped"])
 
             except:
                 log("ERROR", "Error while processing Work Managers")
-                log("ERROR", str(sys.exc_info()[0]) + " " + str(sys.exc_info()[1]))
+                exc_type, exc_value = sys.exc_info()[:2]
+                log("ERROR", "%s %s", exc_type, exc_value)
                 report.append(["Work manager", wm_name, "Failed"])
                 # log("INFO", "Script execution report:")
                 # create_report(report_title, report, column_names, is_sorted=True)
@@ -242,6 +230,7 @@ def get_prj_details(prj_name):
     This function searches the project by its name.
     Input: A project name by user prompt.
     Output: A tabular report with a list of proxy and business services and their URLs and work managers.
+        "Not found" or "Empty" if there is no such project or it has no services, "Failed" on error.
     Automatic usage:
         wlst manageOSB.py get_prj_details [env] [prj_name]
     """
@@ -252,36 +241,37 @@ def get_prj_details(prj_name):
             raise ValueError("Project name cannot be empty.")
 
     prj_details_report = []
-    log("INFO", "Looking for project '" + prj_name + "'...")
+    log("INFO", "Looking for project '%s'...", prj_name)
 
     try:
-        domainRuntime()
-        alsb_mbean = findService(ALSBConfigurationMBean.NAME, ALSBConfigurationMBean.TYPE)
-        psc_mbean = findService(ProxyServiceConfigurationMBean.NAME, ProxyServiceConfigurationMBean.TYPE)
-        biz_mbean = findService(BusinessServiceConfigurationMBean.NAME, BusinessServiceConfigurationMBean.TYPE)
+        ensure_domain_runtime()
+        alsb_mbean = find_mbean(ALSBConfigurationMBean.NAME, ALSBConfigurationMBean.TYPE)
+        psc_mbean = find_mbean(ProxyServiceConfigurationMBean.NAME, ProxyServiceConfigurationMBean.TYPE)
+        biz_mbean = find_mbean(BusinessServiceConfigurationMBean.NAME, BusinessServiceConfigurationMBean.TYPE)
         ref = Ref("Project", Ref.DOMAIN, prj_name)
         
         if not alsb_mbean.exists(ref):
             return "Not found"
         
-        prj_refs = alsb_mbean.getRefs(ref)
-        for prj_ref in prj_refs:
-            type_id = prj_ref.getTypeId()
-            if type_id == "ProxyService":
-                prx_full_name = prj_ref.fullName
-                service_uri = alsb_mbean.getEnvValue(prj_ref, EnvValueTypes.SERVICE_URI, None)
-                wm_name = alsb_mbean.getEnvValue(prj_ref, EnvValueTypes.WORK_MANAGER, None)
-                status = psc_mbean.isEnabled(prj_ref)
-                prj_details_report.append([prx_full_name, status, service_uri, wm_name])
-            elif type_id == "BusinessService":
-                biz_full_name = prj_ref.fullName
-                service_uri_table = alsb_mbean.getEnvValue(prj_ref, EnvValueTypes.SERVICE_URI_TABLE, None)
-                service_url_xml = parseString(service_uri_table.toString())
-                xml_uri = service_url_xml.getElementsByTagName("tran:URI")[0].toxml()
-                service_uri = xml_uri.replace("<tran:URI>", "").replace("</tran:URI>", "")
-                wm_name = alsb_mbean.getEnvValue(prj_ref, EnvValueTypes.WORK_MANAGER, None)
-                status = biz_mbean.isEnabled(prj_ref)
-                prj_details_report.append([biz_full_name, status, service_uri, wm_name])
+        # Proxy services
+        prx_refs = get_prj_refs(alsb_mbean, prj_name, "ProxyService")
+        env_values = get_env_values(alsb_mbean, prx_refs, [EnvValueTypes.SERVICE_URI, EnvValueTypes.WORK_MANAGER])
+        for prx_ref in prx_refs:
+            prx_full_name = prx_ref.fullName
+            service_uri = env_values.get((prx_full_name, EnvValueTypes.SERVICE_URI))
+            wm_name = env_values.get((prx_full_name, EnvValueTypes.WORK_MANAGER))
+            status = psc_mbean.isEnabled(prx_ref)
+            prj_details_report.append([prx_full_name, status, service_uri, wm_name])
+
+        # Business services
+        biz_refs = get_prj_refs(alsb_mbean, prj_name, "BusinessService")
+        env_values = get_env_values(alsb_mbean, biz_refs, [EnvValueTypes.SERVICE_URI_TABLE, EnvValueTypes.WORK_MANAGER])
+        for biz_ref in biz_refs:
+            biz_full_name = biz_ref.fullName
+            service_uri = get_service_uri(env_values.get((biz_full_name, EnvValueTypes.SERVICE_URI_TABLE)))
+            wm_name = env_values.get((biz_full_name, EnvValueTypes.WORK_MANAGER))
+            status = biz_mbean.isEnabled(biz_ref)
+            prj_details_report.append([biz_full_name, status, service_uri, wm_name])
 
         if prj_details_report:
             return prj_details_report
@@ -289,8 +279,53 @@ def get_prj_details(prj_name):
             return "Empty"
 
     except:
-        log("ERROR", str(sys.exc_info()[0]) + " " + str(sys.exc_info()[1]))
-        return prj_details_report
+        exc_type, exc_value = sys.exc_info()[:2]
+        log("ERROR", "%s %s", exc_type, exc_value)
+        return "Failed"
+
+
+def get_prj_refs(alsb_mbean, prj_name, type_id):
+    """
+    Function get_prj_refs returns the refs of the given resource type found anywhere in the given project.
+    Input: alsb_mbean, project name and resource type, e.g. "ProxyService" or "BusinessService"
+    """
+    query = ResourceQuery(type_id)
+    query.setPath(prj_name)
+    query.setRecursiveSearch(True)
+    return alsb_mbean.getRefs(query)
+
+
+def get_service_uri(service_uri_table):
+    """
+    Function get_service_uri returns the text of the first <tran:URI> element of a business service's
+    SERVICE_URI_TABLE env value, or "" if there is none.
+    """
+    if service_uri_table is None:
+        return ""
+    uri_match = URI_RE.search(service_uri_table.toString())
+    if uri_match:
+        return uri_match.group(1)
+    return ""
+
+
+def get_env_values(alsb_mbean, refs, env_value_types):
+    """
+    Function get_env_values reads the given environment values of all the given refs with one findEnvValues call
+    instead of one getEnvValue call per ref and value type.
+    Input: alsb_mbean, a collection of refs and a list of EnvValueTypes
+    Output: A dictionary {(ref full name, env value type): env value}. Only values without a location are included,
+        i.e. the same values getEnvValue(ref, env_value_type, None) returns.
+    """
+    env_values = {}
+    # An EnvValueQuery without refs searches the whole domain
+    if not refs:
+        return env_values
+    # EnvValueQuery(resource types, env value types, refs, search location, search string, use regex)
+    query = EnvValueQuery(None, HashSet(env_value_types), refs, False, None, False)
+    for env_value in alsb_mbean.findEnvValues(query):
+        if env_value.getLocation() is None:
+            env_values[(env_value.getOwner().getFullName(), env_value.getEnvValueType())] = env_value.getValue()
+    return env_values
 
 
 def manage_proxy_services(connection_info):
@@ -301,19 +336,53 @@ def manage_proxy_services(connection_info):
     Input: Space separated list of services' full names, e.g. Prj1/Proxy/Proxy1 Prj2/Proxy/Proxy2
     Output: Tabular report that contains SERVICE_PATH, STATUS and SERVICE_URI
     """
+    toggle_proxy_services(connection_info, "manage_proxy_services", "", "STATUS",
+                          "isEnabled", "disableService", "enableService")
+
+
+def proxy_services_monitoring(connection_info):
+    """
+    proxy_services_monitoring activates or deactivates monitoring of the given proxy services based on the user's choice of action:
+        1 - activate;
+        0 - deactivate.
+    Input: Space separated list of proxy services' full names, e.g. Prj1/Proxy/Proxy1 Prj2/Proxy/Proxy2
+    Output: Tabular report that contains SERVICE_PATH, MONITORING and SERVICE_URI
+    """
+    toggle_proxy_services(connection_info, "proxy_services_monitoring", "monitoring of ", "MONITORING",
+                          "isMonitoringEnabled", "disableMonitoring", "enableMonitoring")
+
+
+def toggle_proxy_services(connection_info, function_name, target, state_col_name,
+                          get_state_name, disable_name, enable_name):
+    """
+    Function toggle_proxy_services implements manage_proxy_services and proxy_services_monitoring.
+    It disables or enables a feature of the given proxy services depending on user's choice of action:
+        1 - enable;
+        0 - disable.
+    Proxy services are given by full path, e.g. MyProject/Proxies/MyProxy. A path containing "*" is
+    a pattern and is resolved with a ProxyServiceQuery, e.g. MyProject/Proxies/* or MyProject/Proxies/My*.
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password
+    :type function_name: str. Name of the calling function. Used for logging.
+    :type target: str. What is toggled as a prefix to "proxy", e.g. "" or "monitoring of ". Used for messages.
+    :type state_col_name: str. Report column name of the new state, e.g. "STATUS"
+    :type get_state_name: str. Name of the ProxyServiceConfigurationMBean method returning the state, e.g. "isEnabled"
+    :type disable_name: str. Name of the ProxyServiceConfigurationMBean method disabling the feature
+    :type enable_name: str. Name of the ProxyServiceConfigurationMBean method enabling the feature
+    """
+    noun = (target + "proxy").capitalize()  # "Proxy" or e.g. "Monitoring of proxy"
+
     while True:
         prx_full_names = raw_input("[INPUT] Enter full paths of proxy services separated by space: ")
-        if not prx_full_names:
+        if not prx_full_names.strip():
             print(
                 cur_dt() + " [ERROR] The list cannot be empty and must contain at least one path")
             continue
 
         else:
             break
-    prx_full_names = prx_full_names.split(" ")
+    prx_full_names = prx_full_names.split()
 
-
-    action = raw_input("[INPUT] Type '0' to disable or '1' to enable proxy service(-s): ")
+    action = raw_input("[INPUT] Type '0' to disable or '1' to enable " + target + "proxy service(-s): ")
     action = int(action.strip())
 
     if action == 1:
@@ -321,232 +390,202 @@ def manage_proxy_services(connection_info):
     else:
         actionTxt = "disable"
 
-    log("INFO", "List of projects to be " + actionTxt + "d: " + ", ".join(prx_full_names) + ".")
+    log("INFO", "Going to %s %sproxy services: %s.", actionTxt, target, ", ".join(prx_full_names))
     
     report = []
-    column_names = ("SERVICE_FULL_NAME", "STATUS", "SERVICE_URI")
-    report_title = "REPORT: Proxy services " + actionTxt + "d on '" + connection_info["url"] + "'"
+    column_names = ("SERVICE_FULL_NAME", state_col_name, "SERVICE_URI")
+    report_title = "REPORT: " + noun + " services " + actionTxt + "d on '" + connection_info["url"] + "'"
 
     try:
-        domainRuntime()
-        session_name = connection_info["username"] + "_" + str(System.currentTimeMillis())
-        session_mbean = findService(SessionManagementMBean.NAME, SessionManagementMBean.TYPE)
+        ensure_domain_runtime()
+        session_name = new_session_name(connection_info)
+        session_mbean = get_session_mbean()
         
-        log("INFO", "Creating session '" + session_name + "'...")
+        log("INFO", "Creating session '%s'...", session_name)
         session_mbean.createSession(session_name)
-        # log("INFO", "Session '" + session_name + "' created.")
+        log("INFO", "Session '%s' created.", session_name)
         
-        alsb_mbean = findService("ALSBConfiguration." + session_name, ALSBConfigurationMBean.TYPE)
-        psc_mbean = findService("ProxyServiceConfiguration." + session_name, ProxyServiceConfigurationMBean.TYPE)
+        alsb_mbean = find_mbean("ALSBConfiguration." + session_name, ALSBConfigurationMBean.TYPE)
+        psc_mbean = find_mbean("ProxyServiceConfiguration." + session_name, ProxyServiceConfigurationMBean.TYPE)
+        get_state = getattr(psc_mbean, get_state_name)
+        if action == 0:
+            apply_action = getattr(psc_mbean, disable_name)
+        else:
+            apply_action = getattr(psc_mbean, enable_name)
         
         mod_prx_cnt = 0
-        prx_full_names_cnt = 0
+        prx_full_names_cnt = len(prx_full_names)
+
+        # Resolve all proxy refs with one call instead of one query per proxy
+        prx_refs_by_name = {}
+        for ref in alsb_mbean.getRefs(PROXY_SERVICES_QUERY):
+            prx_refs_by_name[ref.fullName] = ref
         
         for prx_full_name in prx_full_names:
-            log("INFO", "Processing '" + prx_full_name + "'...")
-            prx_full_name = prx_full_name.strip()
-            prx_local_name = prx_full_name.split("/")[-1]
-            prx_path = "/".join(prx_full_name.split("/")[0:-1])
-
-            query = ProxyServiceQuery()
-            query.setLocalName(prx_local_name)
-            query.setPath(prx_path)
-
-            prx_refs = alsb_mbean.getRefs(query)
-
-            if prx_refs.size() == 0:
-                log("WARNING", "Proxy '" + prx_full_name + "' was not found.")
+            log("INFO", "Processing '%s'...", prx_full_name)
+            if "*" in prx_full_name:
+                # A pattern can match several proxies, so resolve it with a query
+                prx_path, sep, prx_local_name = prx_full_name.rpartition("/")
+                prx_query = ProxyServiceQuery()
+                prx_query.setLocalName(prx_local_name)
+                prx_query.setPath(prx_path)
+                prx_refs = list(alsb_mbean.getRefs(prx_query))
+            elif prx_full_name in prx_refs_by_name:
+                prx_refs = [prx_refs_by_name[prx_full_name]]
+            else:
+                prx_refs = []
+            if not prx_refs:
+                log("WARNING", "Proxy '%s' was not found.", prx_full_name)
                 report.append([prx_full_name, "Not found", "N/A"])
                 continue
             
-            prx_full_names_cnt = len(prx_full_names)
-            
             for ref in prx_refs:
+                prx_local_name = ref.localName
                 service_uri = alsb_mbean.getEnvValue(ref, EnvValueTypes.SERVICE_URI, None)
-                is_enabled = psc_mbean.isEnabled(ref)
-                
+                is_enabled = get_state(ref)
+            
                 if action == is_enabled:
-                    log("INFO", "Proxy '" + prx_local_name + "' is already " + actionTxt + "d.")
-                    report.append([prx_full_name, actionTxt.capitalize() + "d*", service_uri])
+                    log("INFO", "%s '%s' is already %sd.", noun, prx_local_name, actionTxt)
+                    report.append([ref.fullName, actionTxt.capitalize() + "d*", service_uri])
                     continue
-                
-                log("INFO", "Going to " + actionTxt + " '" + prx_local_name + "'...")
-                
-                if action == 0:
-                    psc_mbean.disableService(ref)
-                else:
-                    psc_mbean.enableService(ref)
-                
+            
+                log("INFO", "Going to %s %s'%s'...", actionTxt, target, prx_local_name)
+            
+                apply_action(ref)
+            
                 mod_prx_cnt += 1
 
-                log("INFO", "Proxy '" + prx_local_name + "' was " + actionTxt + "d successfully.")
+                log("INFO", "%s '%s' was %sd successfully.", noun, prx_local_name, actionTxt)
                 print("")
-                
-                if prx_full_names_cnt == 1:
-                    log("INFO", "Activating session '" + session_name + "'...")
+            
+                if prx_full_names_cnt == 1 and len(prx_refs) == 1:
+                    log("INFO", "Activating session '%s'...", session_name)
                     if is_standalone:
-                        session_mbean.activateSession(session_name, prx_local_name + " " + actionTxt + "d")
+                        session_mbean.activateSession(session_name, target + prx_local_name + " " + actionTxt + "d")
                     else:
                         comment = raw_input(
                             "[INPUT] Enter session activation comment: ")
                         session_mbean.activateSession(session_name, comment)
-                report.append([prx_full_name, actionTxt.capitalize() + "d", service_uri])
+                    forget_session_mbeans(session_name)
+                report.append([ref.fullName, actionTxt.capitalize() + "d", service_uri])
 
-        if prx_full_names_cnt > 1 and mod_prx_cnt > 0:
-            log("INFO", "Activating session '" + session_name + "'...")
+        # Several proxies were given or matched by a pattern, so the session was not activated in the loop
+        if mod_prx_cnt > 0 and (prx_full_names_cnt > 1 or len(prx_refs) > 1):
+            log("INFO", "Activating session '%s'...", session_name)
             if is_standalone:
-                session_mbean.activateSession(session_name, str(mod_prx_cnt) + " proxy services " + actionTxt + "d")
+                session_mbean.activateSession(session_name, target.capitalize() + str(mod_prx_cnt)
+                                              + " proxy services " + actionTxt + "d")
             else:
                 comment = raw_input(
                     "[INPUT] Enter session activation comment: ")
                 session_mbean.activateSession(session_name, comment)
+            forget_session_mbeans(session_name)
         elif mod_prx_cnt == 0:
-            log("INFO", "No proxy services were modified. Discarding session '" + session_name + "'...")
+            log("INFO", "No proxy services were modified. Discarding session '%s'...", session_name)
             discard_session(session_mbean, session_name)
 
         # Create execution report
         print("")
         create_report(report_title, report, column_names, is_sorted=True)
 
-    except (WLSTException, ValueError, NameError, Exception, AttributeError, EOFError), e:
-        log("ERROR", "An error occurred in manage_proxy_services. Discarding session...")
+    except (WLSTException, Exception), e:
+        log("ERROR", "An error occurred in %s. Discarding session...", function_name)
         discard_session(session_mbean, session_name)
         if report:
             create_report(report_title, report, column_names, is_sorted=True)
         log("ERROR", str(e))
 
 
-def proxy_services_monitoring(connection_info):
+def discard_session(session_mbean, session_name):
     """
-    proxy_services_monitoring activates or deactivates monitoring of the given proxy services based on the user's choice of action:
-        1 - activate;
-        0 - deactivate.
-    Input: Space separated list of proxy services' full names, e.g. Prj1/Proxy/Proxy1 Prj2/Proxy/Proxy2
-    Output: Tabular report that contains SERVICE_PATH, STATUS and SERVICE_URI
+    Function discard_session discards a given sessions
+    Input: session_mbean and session_name
     """
-    while True:
-        prx_full_names = raw_input("[INPUT] Enter full paths of proxy services separated by space: ")
-        if not prx_full_names:
-            print(
-                cur_dt() + " [ERROR] The list cannot be empty and must contain at least one path")
-            continue
+    if session_mbean:
+        if session_mbean.sessionExists(session_name):
+            session_mbean.discardSession(session_name)
+            log("INFO", "Session '%s' was discarded successfully.", session_name)
+    forget_session_mbeans(session_name)
 
-        else:
-            break
-    prx_full_names = prx_full_names.strip().split(" ")
 
-    action = raw_input("[INPUT] Type '0' to disable or '1' to enable monitoring of proxy service(-s): ")
-    action = int(action.strip())
+def find_mbean(name, mbean_type):
+    """
+    Function find_mbean is a caching wrapper around findService.
+    Found MBeans are kept in mbean_cache by (name, type) until the connection is changed or, for session MBeans,
+    until the session is activated or discarded.
+    :type name: str. MBean name, e.g. ALSBConfigurationMBean.NAME or "ALSBConfiguration." + session_name
+    :type mbean_type: str. MBean type, e.g. ALSBConfigurationMBean.TYPE
+    """
+    key = (name, mbean_type)
+    mbean = mbean_cache.get(key)
+    if mbean is None:
+        mbean = findService(name, mbean_type)
+        if mbean is not None:
+            mbean_cache[key] = mbean
+    return mbean
 
-    if action == 1:
-        actionTxt = "enable"
-    else:
-        actionTxt = "disable"
 
-    log("INFO", "List of proxy service for which monitoring will be " + actionTxt + "d: " + ", ".join(prx_full_names) + ".")
-    
-    report = []
-    column_names = ("SERVICE_FULL_NAME", "MONITORING", "SERVICE_URI")
-    report_title = "REPORT: Proxy services for which monitoring has been " + actionTxt + "d on '" + connection_info["url"] + "'"
+def reset_connection_cache():
+    """
+    Function reset_connection_cache forgets the MBeans, the WLST tree and the JMS destinations of the previous
+    connection.
+    Must be called whenever a new connection is made.
+    """
+    global is_in_domain_runtime, jms_destinations
+    mbean_cache.clear()
+    is_in_domain_runtime = False
+    jms_destinations = None
 
-    try:
+
+def ensure_domain_runtime():
+    """
+    Function ensure_domain_runtime navigates WLST to the domainRuntime tree unless it is already there.
+    """
+    global is_in_domain_runtime
+    if not is_in_domain_runtime:
         domainRuntime()
-        session_name = connection_info["username"] + "_" + str(System.currentTimeMillis())
-        session_mbean = findService(SessionManagementMBean.NAME, SessionManagementMBean.TYPE)
-        
-        log("INFO", "Creating session '" + session_name + "'...")
-        session_mbean.createSession(session_name)
-        log("INFO", "Session '" + session_name + "' created.")
-        
-        alsb_mbean = findService("ALSBConfiguration." + session_name, ALSBConfigurationMBean.TYPE)
-        psc_mbean = findService("ProxyServiceConfiguration." + session_name, ProxyServiceConfigurationMBean.TYPE)
-        
-        mod_prx_cnt = 0
-        prx_full_names_cnt = 0
-        
-        for prx_full_name in prx_full_names:
-            log("INFO", "Processing '" + prx_full_name + "'...")
-            prx_full_name = prx_full_name.strip()
-            prx_local_name = prx_full_name.split("/")[-1]
-            prx_path = "/".join(prx_full_name.split("/")[0:-1])
+        is_in_domain_runtime = True
 
-            query = ProxyServiceQuery()
-            query.setLocalName(prx_local_name)
-            query.setPath(prx_path)
 
-            prx_refs = alsb_mbean.getRefs(query)
+def goto_edit_tree():
+    """
+    Function goto_edit_tree navigates WLST to the edit tree, so that the next ensure_domain_runtime call
+    navigates back to the domainRuntime tree.
+    """
+    global is_in_domain_runtime
+    edit()
+    is_in_domain_runtime = False
 
-            if prx_refs.size() == 0:
-                log("WARNING", "Proxy '" + prx_full_name + "' was not found.")
-                report.append([prx_full_name, "Not found", "N/A"])
-                continue
-            
-            prx_full_names_cnt = len(prx_full_names)
-            
-            for ref in prx_refs:
-                service_uri = alsb_mbean.getEnvValue(ref, EnvValueTypes.SERVICE_URI, None)
-                is_enabled = psc_mbean.isMonitoringEnabled(ref)
-                
-                if action == is_enabled:
-                    log("INFO", "Monitoring of proxy '" + prx_local_name + "' is already " + actionTxt + "d.")
-                    report.append([prx_full_name, actionTxt.capitalize() + "d*", service_uri])
-                    continue
-                
-                log("INFO", "Going to " + actionTxt + " monitoring of '" + prx_local_name + "'...")
-                
-                if action == 0:
-                    psc_mbean.disableMonitoring(ref)
-                else:
-                    psc_mbean.enableMonitoring(ref)
-                
-                mod_prx_cnt += 1
 
-                log("INFO", "Monitoring of proxy '" + prx_local_name + "' was " + actionTxt + "d successfully.")
-                print("")
-                
-                if prx_full_names_cnt == 1:
-                    log("INFO", "Activating session '" + session_name + "'...")
-                    if is_standalone:
-                        session_mbean.activateSession(session_name, prx_local_name + " " + actionTxt + "d")
-                    else:
-                        comment = raw_input(
-                            "[INPUT] Enter session activation comment: ")
-                        session_mbean.activateSession(session_name, comment)
-                report.append([prx_full_name, actionTxt.capitalize() + "d", service_uri])
-
-        if prx_full_names_cnt > 1 and mod_prx_cnt > 0:
-            log("INFO", "Activating session '" + session_name + "'...")
-            if is_standalone:
-                session_mbean.activateSession(session_name, "Monitoring of " + str(mod_prx_cnt) + " proxy services is" + actionTxt + "d")
-            else:
-                comment = raw_input(
-                    "[INPUT] Enter session activation comment: ")
-                session_mbean.activateSession(session_name, comment)
-        elif mod_prx_cnt == 0:
-            log("INFO", "No proxy services were modified. Discarding session '" + session_name + "'...")
-            discard_session(session_mbean, session_name)
+def get_session_mbean():
+    """
+    Function get_session_mbean returns the SessionManagementMBean of the current connection.
+    The MBean is looked up only once per connection (see find_mbean).
+    """
+    return find_mbean(SessionManagementMBean.NAME, SessionManagementMBean.TYPE)
 
-        # Create execution report
-        print("")
-        create_report(report_title, report, column_names, is_sorted=True)
 
-    except (WLSTException, ValueError, NameError, Exception, AttributeError, EOFError), e:
-        log("ERROR", "An error occurred in manage_proxy_services. Discarding session...")
-        discard_session(session_mbean, session_name)
-        if report:
-            create_report(report_title, report, column_names, is_sorted=True)
-        log("ERROR", str(e))
+def new_session_name(connection_info):
+    """
+    Function new_session_name returns a unique session name in the format "username_millis".
+    If two sessions are requested within the same millisecond, the later one gets the next millisecond.
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password
+    :rtype: str
+    """
+    global last_session_millis
+    session_millis = max(System.currentTimeMillis(), last_session_millis + 1)
+    last_session_millis = session_millis
+    return connection_info["username"] + "_" + str(session_millis)
 
 
-def discard_session(session_mbean, session_name):
+def forget_session_mbeans(session_name):
     """
-    Function discard_session discards a given sessions
-    Input: session_mbean and session_name
+    Function forget_session_mbeans removes MBeans of the given session from mbean_cache.
+    Input: session_name of an activated or discarded session
     """
-    if session_mbean:
-        if session_mbean.sessionExists(session_name):
-            session_mbean.discardSession(session_name)
-            log("INFO", "Session '" + session_name + "' was discarded successfully.")
+    for key in mbean_cache.keys():
+        if key[0].endswith("." + str(session_name)):
+            del mbean_cache[key]
 
 
 def discard_sessions():  # Under construction...
@@ -555,9 +594,10 @@ def discard_sessions():  # Under construction...
     Input: session_mbean and session_name
     """
     try:
+        reset_connection_cache()
         connect(usrname, password, url)
-        domainRuntime()
-        session_mbean = findService(SessionMBean.NAME, SessionMBean.TYPE)
+        ensure_domain_runtime()
+        session_mbean = find_mbean(SessionMBean.NAME, SessionMBean.TYPE)
         session_names = session_mbean.Sessions
         print("[INFO] Open sessions:")
         for session_name in session_names:
@@ -581,7 +621,7 @@ def discard_sessions():  # Under construction...
         else:
             return
 
-    except (WLSTException, ValueError, NameError, Exception, AttributeError, EOFError), e:
+    except (WLSTException, Exception), e:
         print("[ERROR] Error in discard_sessions. ", str(e))
 
 
@@ -594,28 +634,21 @@ def list_projects(connection_info):
 
     report_title = "REPORT: Oracle Service Bus projects deployed on '" + connection_info["url"] + "'"
     column_names = ["PROJECT_NAME"]
-    projects = []
 
     try:
-        domainRuntime()
-        alsb_mbean = findService(ALSBConfigurationMBean.NAME, ALSBConfigurationMBean.TYPE)
-        # As ALSBConfigurationMBean lacks attribute "projects" in 11g, use a workaround.
-        # projects = alsb_mbean.projects
-        refs_all = alsb_mbean.getRefs(Ref.DOMAIN)
-
-        for ref in refs_all:
-            type_id = ref.getTypeId()
-            if type_id == Ref.PROJECT_REF:
-                prj_name = ref.projectName
-                projects.append([prj_name])
+        ensure_domain_runtime()
+        alsb_mbean = find_mbean(ALSBConfigurationMBean.NAME, ALSBConfigurationMBean.TYPE)
+        prj_refs = alsb_mbean.getProjects()
 
+        projects = ([ref.projectName] for ref in prj_refs)
         create_report(report_title, projects, column_names, is_sorted=True)
 
-        log("INFO", "Projects count: " + str(len(projects)))
+        log("INFO", "Projects count: %s", len(prj_refs))
         print("")
 
     except:
-        log("ERROR", "Error while listing  projects. " + str(e))
+        exc_type, exc_value = sys.exc_info()[:2]
+        log("ERROR", "Error while listing projects. %s %s", exc_type, exc_value)
 
 
 def list_proxy_services(connection_info):
@@ -624,34 +657,29 @@ def list_proxy_services(connection_info):
     The report includes project name, proxy service name, proxy status (1 - enabled, 0 - disabled) and
     the service uri of the proxy
     """
-    report = []
     report_title = "REPORT: Proxy services deployed on '" + connection_info["url"] + "'"
     column_names = ("PROXY_SERVICE_FULL_NAME", "ENBLD#", "SERVICE_URI")
 
     try:
-        domainRuntime()
-        alsb_mbean = findService(ALSBConfigurationMBean.NAME, ALSBConfigurationMBean.TYPE)
-        psc_mbean = findService(ProxyServiceConfigurationMBean.NAME, ProxyServiceConfigurationMBean.TYPE)
+        ensure_domain_runtime()
+        alsb_mbean = find_mbean(ALSBConfigurationMBean.NAME, ALSBConfigurationMBean.TYPE)
+        psc_mbean = find_mbean(ProxyServiceConfigurationMBean.NAME, ProxyServiceConfigurationMBean.TYPE)
         
-        # refs_all = alsb_mbean.getRefs(Ref.DOMAIN)
-        query = ResourceQuery('ProxyService')
-        prx_refs = alsb_mbean.getRefs(query)
+        prx_refs = alsb_mbean.getRefs(PROXY_SERVICES_QUERY)
         
-        log("INFO", "Preparing report on proxy services deployed on '" + connection_info["url"] + "'...")
+        log("INFO", "Preparing report on proxy services deployed on '%s'...", connection_info["url"])
 
-        for ref in prx_refs:
-            prx_full_name = ref.fullName
-            service_uri = alsb_mbean.getEnvValue(ref, EnvValueTypes.SERVICE_URI, None)
-            # workManager = alsb_mbean.getEnvValue(ref, EnvValueTypes.WORK_MANAGER, None)
-            status = psc_mbean.isEnabled(ref)
-            report.append([prx_full_name, status, service_uri])
+        env_values = get_env_values(alsb_mbean, prx_refs, [EnvValueTypes.SERVICE_URI])
+        # Rows are generated while the report is being created: [full name, status, service uri]
+        report = ([ref.fullName, psc_mbean.isEnabled(ref), env_values.get((ref.fullName, EnvValueTypes.SERVICE_URI))]
+                  for ref in prx_refs)
 
         print("")
         create_report(report_title, report, column_names, is_sorted=True)
-        log("INFO", "Proxy services count: " + str(prx_refs.size()))
+        log("INFO", "Proxy services count: %s", len(prx_refs))
         print("")
 
-    except (WLSTException, ValueError, NameError, Exception, AttributeError, EOFError), e:
+    except (WLSTException, Exception), e:
         log("ERROR", str(e))
         log("ERROR", "Error while listing Proxy services")
 
@@ -662,37 +690,30 @@ def list_business_services(connection_info):
     The report includes project name, business service name, business service status (1 - enabled, 0 - disabled)
     and a service uri of the business service
     """
-    report = []
-    report_title = "REPORT: Business services deployed on '" + connection_info["url"] + "'"
+    report_title = "REPORT: Business services deployed on '%s'" % connection_info["url"]
     column_names = ("BUSINESS_SERVICE_FULL_NAME", "ENBLD#", "SERVICE_URI")
-    log("INFO", "Preparing report on business services deployed on '" + connection_info["url"] + "'...")
+    log("INFO", "Preparing report on business services deployed on '%s'...", connection_info["url"])
     
     try:
-        domainRuntime()
-        alsb_mbean = findService(ALSBConfigurationMBean.NAME, ALSBConfigurationMBean.TYPE)
-        biz_mbean = findService(BusinessServiceConfigurationMBean.NAME, BusinessServiceConfigurationMBean.TYPE)
-        
-        query = ResourceQuery('BusinessService')
-        biz_refs = alsb_mbean.getRefs(query)
+        ensure_domain_runtime()
+        alsb_mbean = find_mbean(ALSBConfigurationMBean.NAME, ALSBConfigurationMBean.TYPE)
+        biz_mbean = find_mbean(BusinessServiceConfigurationMBean.NAME, BusinessServiceConfigurationMBean.TYPE)
         
-        for ref in biz_refs:
-            biz_full_name = ref.fullName
-            service_uri_table = alsb_mbean.getEnvValue(ref, EnvValueTypes.SERVICE_URI_TABLE, None)
-            service_url_xml = parseString(service_uri_table.toString())
-            xml_uri = service_url_xml.getElementsByTagName('tran:URI')[0].toxml()
-            service_uri = xml_uri.replace("<tran:URI>", "").replace("</tran:URI>", "")
-            # workManager = alsb_mbean.getEnvValue(ref, EnvValueTypes.WORK_MANAGER, None) - Not used
-            status = biz_mbean.isEnabled(ref)
-            report.append([biz_full_name, status, service_uri])
+        biz_refs = alsb_mbean.getRefs(BUSINESS_SERVICES_QUERY)
+        env_values = get_env_values(alsb_mbean, biz_refs, [EnvValueTypes.SERVICE_URI_TABLE])
+        # Rows are generated while the report is being created: [full name, status, service uri]
+        report = ([ref.fullName, biz_mbean.isEnabled(ref),
+                   get_service_uri(env_values.get((ref.fullName, EnvValueTypes.SERVICE_URI_TABLE)))]
+                  for ref in biz_refs)
 
         print("")
         create_report(report_title, report, column_names, is_sorted=True)
-        log("INFO", "Business services count: " + str(biz_refs.size()))
+        log("INFO", "Business services count: %s", len(biz_refs))
         print("")
 
-    except (WLSTException, ValueError, NameError, Exception, AttributeError, EOFError), e:
+    except (WLSTException, Exception), e:
         log("ERROR", str(e))
-        log("ERROR", "Error while listing Business Services" + str(sys.exc_info()[0]))
+        log("ERROR", "Error while listing Business Services. %s", sys.exc_info()[0])
 
 
 def delete_work_manager(wm_name):
@@ -702,7 +723,7 @@ def delete_work_manager(wm_name):
     """
     wm_report = []
     try:
-        edit()
+        goto_edit_tree()
         startEdit()
         print("")
         cd('edit:/SelfTuning/')
@@ -711,46 +732,44 @@ def delete_work_manager(wm_name):
         wm_bean = getMBean(wm_name)
         
         if wm_bean:
-            log("INFO", "Work manager '" + wm_name + "' was found.")
+            log("INFO", "Work manager '%s' was found.", wm_name)
             maxtc = wm_bean.getMaxThreadsConstraint()
             mintc = wm_bean.getMinThreadsConstraint()
             
             # First remove MaxThreadsConstraint if exists
             if maxtc:
                 maxtc_name = maxtc.name
-                log("INFO", "Deleting MaxThreadsConstraint '" + maxtc_name + "'...")
+                log("INFO", "Deleting MaxThreadsConstraint '%s'...", maxtc_name)
                 editService.getConfigurationManager().removeReferencesToBean(maxtc)
                 cmo.destroyMaxThreadsConstraint(maxtc)
-                log("INFO", "MaxThreadsConstraint '" + maxtc_name + "' was deleted successfully.")
+                log("INFO", "MaxThreadsConstraint '%s' was deleted successfully.", maxtc_name)
                 wm_report.append(["MaxThreadsConstraint", maxtc_name, "Deleted"])
             
             # Then remove MinThreadsConstraint if exists
             if mintc:
                 mintc_name = mintc.name
-                log("INFO", "Deleting MinThreadsConstraint '" + mintc_name + "'...")
+                log("INFO", "Deleting MinThreadsConstraint '%s'...", mintc_name)
                 editService.getConfigurationManager().removeReferencesToBean(mintc)
                 cmo.destroyMinThreadsConstraint(mintc)
-                log("INFO", "MinThreadsConstraint '" + mintc_name + "' was deleted successfully.")
+                log("INFO", "MinThreadsConstraint '%s' was deleted successfully.", mintc_name)
                 wm_report.append(["MinThreadsConstraint", mintc_name, "Deleted"])
             
             # Lastly remove work manager
-            log("INFO", "Deleting Work manager '" + wm_name + "'...")
+            log("INFO", "Deleting Work manager '%s'...", wm_name)
             editService.getConfigurationManager().removeReferencesToBean(wm_bean)
             cmo.destroyWorkManager(wm_bean)
-            log("INFO", "Work manager '" + wm_name + "' was deleted successfully.")
+            log("INFO", "Work manager '%s' was deleted successfully.", wm_name)
             wm_report.append(["Work manager", wm_name, "Deleted"])
-            log("INFO", "Saving changes...")
-            save()
-            log("INFO", "Activating changes...")
-            activate(block="true")
+            save_and_activate()
 
         else:
-            log("WARNING", "Work manager '" + wm_name + "' was not found.")
+            log("WARNING", "Work manager '%s' was not found.", wm_name)
             wm_report.append(["Work manager", wm_name, "Not found"])
 
     except:
-        log("ERROR", str(sys.exc_info()[0]) + " " + str(sys.exc_info()[1]))
-        log("ERROR", "An error occurred when deleting work manager '" + wm_name + "'. Undoing changes...")
+        exc_type, exc_value = sys.exc_info()[:2]
+        log("ERROR", "%s %s", exc_type, exc_value)
+        log("ERROR", "An error occurred when deleting work manager '%s'. Undoing changes...", wm_name)
         wm_report.append(["Work manager", wm_name, "Failed"])
         # undo("true", "y")
         cancelEdit("y")
@@ -764,269 +783,238 @@ def delete_queue(queue_name):
     Currently supporting: Queue, UniformDistributedQueue, ForeignDestination
     Input: Queue name, e.g. WLMsgQueueName1
     """
+    global jms_destinations
     queues_report = []
     queue_name = queue_name.strip()
-    is_queue_found = False
-    is_queue_skipped = False
-    is_queue_deleted = False
     is_dmq_queue_deleted = False
     
     if not queue_name:
         return queues_report
     
     try:
-        edit()
+        goto_edit_tree()
         startEdit()
-        cd("/")
-        
-        my_jms_system_resources = cmo.JMSSystemResources
         
-        for my_jms_system_resource in my_jms_system_resources:
-            jms_module_name = my_jms_system_resource.name
-            cd('/JMSSystemResources/' + jms_module_name + '/JMSResource/' + jms_module_name)
-            
-            # Search for the queue among Uniform Distributed queues
-            queue_bean = cmo.lookupUniformDistributedQueue(queue_name)
-            if queue_bean:
-                is_queue_found = True
-                print("")
-                log("INFO", "UniformDistributedQueue '" + queue_name + "' was found in JMS module '"
-                    + jms_module_name + "'")
-                
-                if is_standalone:
-                    del_queue_choice = "Y"
-                else:
-                    del_queue_choice = raw_input("[INPUT] Do you want to delete this queue, Y/N [Y]? ")
-                
-                if del_queue_choice.upper() == "Y" or del_queue_choice.strip() == "":    
-                    # Check if queue_name has an error destination (DMQ)
-                    dmq_queue_bean = queue_bean.getDeliveryFailureParams().getErrorDestination()
-                    
-                    # Delete the queue
-                    log("INFO", "Deleting UniformDistributedQueue '" + queue_name + "'...")
-                    cmo.destroyUniformDistributedQueue(queue_bean)
-                    log("INFO", "UniformDistributedQueue '" + queue_name + "' deleted")
-                    
-                    # Delete the DMQ if OK
-                    if dmq_queue_bean:
-                        dmq_name = dmq_queue_bean.name
-                        log("INFO", "UniformDistributedQueue queue '" + queue_name 
-                            + "' used Error Destination (DMQ) '" + dmq_name + "'")
-    
-                        if is_standalone:
-                            del_queue_choice = "Y"
-                        else:
-                            del_queue_choice = raw_input("[INPUT] Do you want to delete this DMQ, Y/N [Y]? ")
-                        
-                        if del_queue_choice.upper() == "Y" or del_queue_choice.strip() == "":
-                            log("INFO", "Deleting DMQ '" + dmq_name + "'...")
-                            cmo.destroyUniformDistributedQueue(dmq_queue_bean)
-                            log("INFO", "DMQ '" + dmq_name + "' deleted")
-                            is_dmq_queue_deleted = True
-                        else:
-                            queues_report.append(["DMQ", dmq_name, "Skipped"])
-                    
-                    # Save and activate changes
-                    log("INFO", "Saving changes...")
-                    save()
-                    log("INFO", "Activating changes...")
-                    activate(block="true")
-                    is_queue_deleted = True
-
-                    # Update report
-                    queues_report.append(["UniformDistributedQueue", queue_name, "Deleted"])
-                    if is_dmq_queue_deleted:
-                        queues_report.append(["DMQ", dmq_name, "Deleted"])
-                    
-                    # Stop searching in different JMS modules
-                    break
-                
-                else:
-                    log("INFO", "UniformDistributedQueue '" + queue_name + "was skipped by the user.")
-                    queues_report.append(["UniformDistributedQueue", queue_name, "Skipped"])
-                    cancelEdit("y")
-            
-            # Search for the queue_name among Queues
+        # Look the queue up in the index of all JMS destinations instead of searching every JMS module
+        is_index_new = jms_destinations is None
+        queue_bean, destination = find_jms_destination(queue_name)
+        if not queue_bean and not is_index_new:
+            # The queue may have been created or deleted since the index was built, so rebuild it and look again
+            jms_destinations = None
+            queue_bean, destination = find_jms_destination(queue_name)
+
+        if not queue_bean:
+            log("WARNING", "Queue '%s' was not found in any JMS module.", queue_name)
+            queues_report.append(["Queue", queue_name, "Not found"])
+            cancelEdit("y")
+            return queues_report
+
+        jms_module_name, destination_type = destination[:2]
+        print("")
+        log("INFO", "%s '%s' was found in JMS module '%s'.", destination_type, queue_name, jms_module_name)
+
+        if confirm("[INPUT] Do you want to delete this queue, Y/N [Y]? "):
+            if destination_type == "ForeignDestination":
+                # Delete the queue
+                log("INFO", "Deleting ForeignDestination '%s'...", queue_name)
+                cmo.destroyForeignDestination(queue_bean)
+                log("INFO", "ForeignDestination '%s' was deleted", queue_name)
             else:
-                queue_bean = cmo.lookupQueue(queue_name)
-                if queue_bean:
-                    is_queue_found = True
-                    print("")
-                    log("INFO", "Queue '" + queue_name + "' was found in JMS module '" + jms_module_name + "'.")
-                    
-                    if is_standalone:
-                        del_queue_choice = "Y"
-                    else:
-                        del_queue_choice = raw_input("[INPUT] Do you want to delete this queue, Y/N [Y]? ")
-                    
-                    # Delete
-                    if del_queue_choice.upper() == "Y" or del_queue_choice.strip() == "":
-                         # Check if queue_name has an error destination (DMQ)
-                        dmq_queue_bean = queue_bean.getDeliveryFailureParams().getErrorDestination()
-                        
-                        # Delete the queue
-                        log("INFO", "Deleting Queue '" + queue_name + "...")
-                        cmo.destroyQueue(queue_bean)
-                        print("[INFO] Queue '" + queue_name + "' was deleted.")
-                        
-                        # Delete the DMQ if OK
-                        if dmq_queue_bean:
-                            dmq_name = dmq_queue_bean.name
-                            log("INFO", "Queue '" + queue_name 
-                                + "' used Error Destination (DMQ) '" + dmq_name + "'")
-                            
-                            if is_standalone:
-                                del_queue_choice = "Y"
-                            else:
-                                del_queue_choice = raw_input("[INPUT] Do you want to delete this DMQ, Y/N [Y]? ")
-                            
-                            if del_queue_choice.upper() == "Y" or del_queue_choice.strip() == "":
-                                log("INFO", "Deleting DMQ '" + dmq_name + "'...")
-                                cmo.destroyQueue(dmq_queue_bean)
-                                is_dmq_queue_deleted = True
-                            else:
-                                queues_report.append(["DMQ", dmq_name, "Skipped"])
-                                
-                        # Save and activate changes
-                        log("INFO", "Saving changes...")
-                        save()
-                        log("INFO", "Activating changes...")
-                        activate(block="true")
-                        is_queue_deleted = True
-
-                        # Update report
-                        queues_report.append(["Queue", queue_name, "Deleted"])
-                        if is_dmq_queue_deleted:
-                            queues_report.append(["DMQ", dmq_name, "Deleted"])
-
-                        # Stop searching in all JMS modules
-                        break
-                    
-                    # Skip
-                    else:
-                        log("INFO", "UniformDistributedQueue '" + queue_name + "was skipped by the user.")
-                        queues_report.append(["UniformDistributedQueue", queue_name, "Skipped"])
-                        cancelEdit("y")
-                
-                # Search for the queue_name in all foreign servers
+                # Check if queue_name has an error destination (DMQ)
+                dmq_queue_bean = queue_bean.getDeliveryFailureParams().getErrorDestination()
+
+                # The queue and its DMQ are destroyed by the same method
+                if destination_type == "UniformDistributedQueue":
+                    destroy_queue = cmo.destroyUniformDistributedQueue
                 else:
-                    print("")
-                    frn_srvs = cmo.getForeignServers()
-                    
-                    for frn_srv in frn_srvs:
-                        fd_bean = frn_srv.lookupForeignDestination(queue_name)
-                        
-                        if fd_bean:
-                            is_queue_found = True
-                            cd('/JMSSystemResources/' + jms_module_name + '/JMSResource/' + jms_module_name
-                               + '/ForeignServers/' + frn_srv.name)
-                            print("")
-                            log("INFO", "ForeignDestination '" + queue_name + "' was found in JMS module '"
-                                + jms_module_name + "'.")
-                            if is_standalone:
-                                del_queue_choice = "Y"
-                            else:
-                                del_queue_choice = raw_input("[INPUT] Do you want to delete this queue, Y/N [Y]? ")
-                            
-                            # Delete
-                            if del_queue_choice.upper() == "Y" or del_queue_choice.strip() == "":
-                                log("INFO", "Deleting Queue '" + queue_name + "...")
-                                cmo.destroyForeignDestination(fd_bean)
-                                log("INFO", "ForeignDestination '" + queue_name + "' was deleted")
-                                
-                                log("INFO", "Saving changes...")
-                                save()
-                                log("INFO", "Activating changes...")
-                                activate(block="true")
-                                is_queue_deleted = True
-
-                                # Update report
-                                queues_report.append(["ForeignDestination", queue_name, "Deleted"])
-
-                                # Stop searching in different Foreign Servers frn_srvs
-                                break
-                            
-                            # Skip
-                            else:
-                                log("INFO", "ForeignDestination '" + queue_name + "was skipped by the user.")
-                                queues_report.append(["ForeignDestination", queue_name, "Skipped"])
-                                cancelEdit("y")
-                    # TODO: Add topics
-                    
-                    # Stop searching in all JMS modules
-                    if is_queue_found:
-                        break
+                    destroy_queue = cmo.destroyQueue
+
+                # Delete the queue
+                log("INFO", "Deleting %s '%s'...", destination_type, queue_name)
+                destroy_queue(queue_bean)
+                log("INFO", "%s '%s' was deleted", destination_type, queue_name)
+
+                # Delete the DMQ if OK
+                if dmq_queue_bean:
+                    dmq_name = dmq_queue_bean.name
+                    log("INFO", "%s '%s' used Error Destination (DMQ) '%s'", destination_type, queue_name, dmq_name)
+
+                    if confirm("[INPUT] Do you want to delete this DMQ, Y/N [Y]? "):
+                        log("INFO", "Deleting DMQ '%s'...", dmq_name)
+                        destroy_queue(dmq_queue_bean)
+                        log("INFO", "DMQ '%s' deleted", dmq_name)
+                        is_dmq_queue_deleted = True
+                    else:
+                        queues_report.append(["DMQ", dmq_name, "Skipped"])
 
-        if not is_queue_found:
-            log("WARNING", "Queue '" + queue_name + "' was not found in any JMS module.")
-            queues_report.append(["Queue", queue_name, "Not found"])
+            save_and_activate()
+
+            # Update report and index
+            queues_report.append([destination_type, queue_name, "Deleted"])
+            del jms_destinations[queue_name]
+            if is_dmq_queue_deleted:
+                queues_report.append(["DMQ", dmq_name, "Deleted"])
+                if dmq_name in jms_destinations:
+                    del jms_destinations[dmq_name]
+
+        else:
+            log("INFO", "%s '%s' was skipped by the user.", destination_type, queue_name)
+            queues_report.append([destination_type, queue_name, "Skipped"])
             cancelEdit("y")
+        # TODO: Add topics
         
         return queues_report
 
     except:
         print("")
-        log("ERROR", str(sys.exc_info()[0]) + " " + str(sys.exc_info()[1]))
+        exc_type, exc_value = sys.exc_info()[:2]
+        log("ERROR", "%s %s", exc_type, exc_value)
         log("Info", "Discarding all changes...")
         undo("true", "y")
         cancelEdit("y")
+        jms_destinations = None  # Rebuild the index next time, it may be out of date
         queues_report.append(["Queue", queue_name, "Failed"])
         return queues_report
 
 
+def get_jms_destinations():
+    """
+    Function get_jms_destinations returns an index of the JMS destinations of all JMS modules:
+        {destination name: (JMS module name, destination type, foreign server name or None)}
+    Destination types: UniformDistributedQueue, Queue, ForeignDestination.
+    The index is built on the first call after connecting, which must be made in the edit tree, and is kept
+    up to date by delete_queue, which rebuilds it when a queue is missing from it. If a name is used more than
+    once, the first JMS module wins and within a module UniformDistributedQueue goes before Queue and Queue
+    before ForeignDestination.
+    """
+    global jms_destinations
+    if jms_destinations is None:
+        jms_destinations = {}
+        cd("/")
+        for jms_system_resource in cmo.JMSSystemResources:
+            jms_module_name = jms_system_resource.name
+            jms_resource = jms_system_resource.getJMSResource()
+            for queue_bean in jms_resource.getUniformDistributedQueues():
+                jms_destinations.setdefault(queue_bean.name, (jms_module_name, "UniformDistributedQueue", None))
+            for queue_bean in jms_resource.getQueues():
+                jms_destinations.setdefault(queue_bean.name, (jms_module_name, "Queue", None))
+            for frn_srv in jms_resource.getForeignServers():
+                for fd_bean in frn_srv.getForeignDestinations():
+                    jms_destinations.setdefault(fd_bean.name, (jms_module_name, "ForeignDestination", frn_srv.name))
+    return jms_destinations
+
+
+def find_jms_destination(queue_name):
+    """
+    Function find_jms_destination looks a JMS destination up by its name using the index of get_jms_destinations.
+    Must be called in the edit tree. Leaves WLST in the JMS module (or foreign server) of the destination.
+    :type queue_name: str
+    :rtype: tuple. (destination bean, index entry), (None, index entry or None) if the destination was not found
+    """
+    destination = get_jms_destinations().get(queue_name)
+    if not destination:
+        return None, None
+    jms_module_name, destination_type, frn_srv_name = destination
+    jms_resource_path = '/JMSSystemResources/' + jms_module_name + '/JMSResource/' + jms_module_name
+    cd(jms_resource_path)
+    if destination_type == "UniformDistributedQueue":
+        queue_bean = cmo.lookupUniformDistributedQueue(queue_name)
+    elif destination_type == "Queue":
+        queue_bean = cmo.lookupQueue(queue_name)
+    else:
+        cd(jms_resource_path + '/ForeignServers/' + frn_srv_name)
+        queue_bean = cmo.lookupForeignDestination(queue_name)
+    return queue_bean, destination
+
+
+def confirm(prompt):
+    """
+    Function confirm asks the user a Y/N question, Y being the default answer.
+    In standalone mode nothing is asked and the answer is Y.
+    :type prompt: str. The question, e.g. "[INPUT] Do you want to delete this queue, Y/N [Y]? "
+    :rtype: bool
+    """
+    if is_standalone:
+        return True
+    return raw_input(prompt).strip().upper() in ("", "Y")
+
+
+def save_and_activate():
+    """
+    Function save_and_activate saves and activates the changes of the current WLS edit session.
+    """
+    log("INFO", "Saving changes...")
+    save()
+    log("INFO", "Activating changes...")
+    activate(block="true")
+
+
 def create_report(report_title, report, col_names, is_sorted):
     """ This function creates a tabular report with left or right text adjustment depending on the content data type.
     Input parameters:
         :param report_title: string. Serves as the report title
-        :param report: list. A table (a 2D list) of data of any type (that can be cast to string)
+        :param report: iterable. Rows (lists) of data of any type (that can be cast to string), e.g. a 2D list
+            or a generator. Rows are converted to strings as they are consumed.
         :param col_names: List. A list of the column names, comma separated and wrapped into [].
             Add '#' to the column name that will contain only numbers for right adjustment
             Example: ["ColTxt1", "ColNum1#", "ColTxt2"]
         :param is_sorted: Boolean. True - sort report rows, False - do not sort.
     """
-    # Convert all values to strings
+    # Remove "#" from headers
+    header = [col_name.replace("#", "") for col_name in col_names]
+
+    # Convert all values to strings and count max column widths on the way
+    col_widths = [len(col_name) for col_name in header]
     report_str = []
+    report_str_append = report_str.append
     for row in report:
         row = [str(item) for item in row]
-        report_str.append(row)
+        for x, value in enumerate(row):
+            width = len(value)
+            if width > col_widths[x]:
+                col_widths[x] = width
+        report_str_append(row)
 
     if is_sorted:
         report_str.sort()
 
-    # Remove "#" from headers and add to the beginning of the report
-    report_str.insert(0, [col_name.replace("#", "") for col_name in col_names])
-
-    # Count max column widths
-    col_widths = [max(map(len, col)) for col in zip(*report_str)]
-
-    # Create an underline and add to report
+    # Create an underline and frame the header and the report with it
     underline = ["=" * width for width in col_widths]
-    report_str.insert(1, underline)  # Header upper border
-    report_str.insert(0, underline)  # Header lower border
-    report_str.append(underline)  # Bottom line
+    report_str = [underline, header, underline] + report_str + [underline]
 
     # Adjust columns left or right
     # rjust/ljust accept only one parameter in ver 2, therefore this workaround.
+    # right-adjust strings of the columns with "#" in the header (numbers) and left-adjust other columns
+    right_align = [("#" in col_name) for col_name in col_names]
     report_adj = []
+    report_adj_append = report_adj.append
     for row in report_str:
-        rw = list(zip(row, col_widths))
         row_adj = []
-        for x in range(len(rw)):
-            # right-adjust strings of the columns with "#" in the header and left-adjust other columns
-            if "#" in col_names[x]:  # The column contains numbers
-                row_adj.append(rw[x][0].rjust(rw[x][1]))
+        row_adj_append = row_adj.append
+        for value, width, is_right in zip(row, col_widths, right_align):
+            if is_right:
+                row_adj_append(value.rjust(width))
             else:
-                row_adj.append(rw[x][0].ljust(rw[x][1]))
-        report_adj.append(" ".join(row_adj))
+                row_adj_append(value.ljust(width))
+        report_adj_append(" ".join(row_adj))
 
-    # Print the report
-    f.write("\n")
-    print("")
-    log_report(report_title)
-    for row in report_adj:
-        log_report(row)
-    f.write("\n")
-    print("")
+    # Print the report: an empty line, the title, the table and another empty line
+    log_report_lines(["", report_title] + report_adj + [""])
+
+
+def unique_list(items):
+    """
+    This function returns the items without duplicates, keeping the order of the first occurrences.
+    :type items: list
+    :rtype: list
+    """
+    seen = set()
+    unique_items = []
+    for item in items:
+        if item not in seen:
+            seen.add(item)
+            unique_items.append(item)
+    return unique_items
 
 
 def cur_dt():
@@ -1038,25 +1026,31 @@ def cur_dt():
     return local_dt
 
 
-def log(level, text):
+def log(level, text, *args):
     """
     Function log appends a log string "text" to the log file f in the format: "YYYY-MM-DD HH:mm:SS id#### [LEVEL] text"
     E.g. "2018-09-05 12:22:33 id0010 [INFO] Creating session"
     :type level: str. INFO, WARNING, ERROR
-    :type text: str. The text of the log message
+    :type text: str. The text of the log message. If args are given, text is a %-format string for them,
+        e.g. log("INFO", "Creating session '%s'...", session_name)
+    :type args: Values to be formatted into text
     """
-    f.write(cur_dt() + " " + ID + " [" + level + "] " + str(text) + "\n")
-    print(cur_dt() + " [" + level + "] " + str(text))
+    if args:
+        text = text % args
+    now = cur_dt()
+    f_write("%s %s [%s] %s\n" % (now, ID, level, text))
+    print("%s [%s] %s" % (now, level, text))
 
 
-def log_report(text):
+def log_report_lines(lines):
     """
-    Function log_report is used for printing a report line to the standard output and the log file f.
-    E.g. "2018-09-05 12:22:33 id0010 [INFO] Creating session"
-    :type text: str
+    Function log_report_lines prints several report lines to the standard output and the log file f
+    with one write to each of them.
+    :type lines: list of str
     """
-    f.write(text + "\n")
-    print(text)
+    text = "\n".join(lines) + "\n"
+    f_write(text)
+    sys.stdout.write(text)
 
 
 def start_connect(function_name, connection_info):
@@ -1067,7 +1061,7 @@ def start_connect(function_name, connection_info):
     :rtype: dict
     """
     log("INFO", "======================================================================")
-    log("INFO", "Starting '" + function_name + "' in '" + connection_info["env"] + "'...")
+    log("INFO", "Starting '%s' in '%s'...", function_name, connection_info["env"])
 
     if not connection_info["is_connected"] or not connection_info["url"]:
         connection_info = connect_wls(connection_info)
@@ -1084,49 +1078,18 @@ def get_avail_envs_report():
     :type connection_info: dict. Connection information: is_connected, env, url, username, password
     :rtype: dict
     """
-    prop_env_file = get_env_prop_file()
-    report = []
-    envs_PROD = []
-    envs_TEST = []
-    envs_QA = []
-    envs_DEV = []
+    # prop_env_file is built once at startup
+    env_groups = ("PROD", "QA", "TEST", "DEV")  # Report columns
+    envs = {}
+    for env_group in env_groups:
+        envs[env_group] = []
     for env in prop_env_file:
         env_group = prop_env_file.get(env).split("_")[0]
-        if env_group == "PROD":
-            envs_PROD.append(env)
-        if env_group == "QA":
-            envs_QA.append(env)
-        if env_group == "TEST":
-            envs_TEST.append(env)
-        if env_group == "DEV":
-            envs_DEV.append(env)
-    envs_PROD.sort()
-    envs_QA.sort()
-    envs_TEST.sort()
-    envs_DEV.sort()
-    env_group_max = max(len(envs_PROD), len(envs_QA), len(envs_PROD), len(envs_QA), len(envs_PROD), len(envs_QA))
-    envs_PROD_len = len(envs_PROD)
-    envs_QA_len = len(envs_QA)
-    envs_TEST_len = len(envs_TEST)
-    envs_DEV_len = len(envs_DEV)
-    for i in range(env_group_max):
-        if envs_PROD_len > i:
-            env_PROD = envs_PROD[i]
-        else:
-            env_PROD = ""
-        if envs_QA_len > i:
-            env_QA = envs_QA[i]
-        else:
-            env_QA = ""
-        if envs_TEST_len > i:
-            env_TEST = envs_TEST[i]
-        else:
-            env_TEST = ""
-        if envs_DEV_len > i:
-            env_DEV = envs_DEV[i]
-        else:
-            env_DEV = ""
-        report.append([env_PROD, env_QA, env_TEST, env_DEV])
+        if env_group in envs:
+            envs[env_group].append(env)
+    for env_group in env_groups:
+        envs[env_group].sort()
+    report = [list(row) for row in izip_longest(*[envs[env_group] for env_group in env_groups], fillvalue="")]
     return report
 
 
@@ -1143,7 +1106,8 @@ def connect_wls(connection_info):
         try:
             disconnect()
         except:
-            log("ERROR", str(sys.exc_info()[0]) + " " + str(sys.exc_info()[1]))
+            exc_type, exc_value = sys.exc_info()[:2]
+            log("ERROR", "%s %s", exc_type, exc_value)
             log("ERROR", "Check your connection details and retry.")
             return
 
@@ -1168,12 +1132,12 @@ def connect_wls(connection_info):
     if env in prop_env_file:
         prop_file_name = prop_env_file[env]
     elif is_standalone:
-        log("ERROR", "Property file for the environment " + env + " was not found. Choose another environment or add the missing property file and restart this script.")
+        log("ERROR", "Property file for the environment %s was not found. Choose another environment or add the missing property file and restart this script.", env)
         f.close()
         disconnect()
         exit()
     else:
-        log("ERROR", "Property file for the environment " + env + " was not found. Choose another environment or add the missing property file and restart this script.")
+        log("ERROR", "Property file for the environment %s was not found. Choose another environment or add the missing property file and restart this script.", env)
         is_connected = False
 
     # Read properties from the propery file
@@ -1184,13 +1148,16 @@ def connect_wls(connection_info):
     username = prop_file.getProperty("usrname")
     password = prop_file.getProperty("password")
 
-    log("INFO", "Trying to connect to " + url + " as " + username + "...")
+    log("INFO", "Trying to connect to %s as %s...", url, username)
     
     try:
+        # MBeans found on the previous connection cannot be reused
+        reset_connection_cache()
         connect(username, password, url)
         is_connected = True
     except:
-        log("ERROR", str(sys.exc_info()[0]) + " " + str(sys.exc_info()[1]))
+        exc_type, exc_value = sys.exc_info()[:2]
+        log("ERROR", "%s %s", exc_type, exc_value)
         log("ERROR", "Check your connection details and try to reconnect")
         is_connected = False
     
@@ -1258,21 +1225,10 @@ def main():
             keep_main_loop = False
         else:
             if connection_info["env"]:
-                cur_con_status = "currently connected to " + connection_info["env"]
+                cur_con_status = "currently connected to %s" % connection_info["env"]
             else:
                 cur_con_status = "currently not connected"
-            print("")
-            print("[0] Change environment (" + cur_con_status + ")")
-            print("[1] List projects deployed on server")
-            print("[2] List proxy services deployed on server")
-            print("[3] List business services deployed on server")
-            print("[4] Undeploy OSB projects")
-            print("[5] Get project details")
-            print("[6] Discard open OSB sessions")
-            print("[7] Disable/Enable proxy services")
-            print("[8] Disable/Enable proxy service monitoring")
-            print("[9] Exit")
-            print("")
+            print(MENU % cur_con_status)
             while True:
                 procedure = raw_input("[INPUT] Choose what you want to do from the list above: ")
                 print("")
@@ -1305,10 +1261,12 @@ def main():
                     report = get_prj_details("")
                 if report == "Not found":
                     log("WARNING", "The project was not found")
+                elif report == "Failed":
+                    log("ERROR", "Could not get the project details.")
                 elif report == "Empty":
                     log("INFO", "The project was found, but does not contain either proxy or business services.")
                 else:
-                    report_title = "REPORT: Project details '" + connection_info["url"] + "'"
+                    report_title = "REPORT: Project details '%s'" % connection_info["url"]
                     column_names = ("SERVICE_PATH", "ENBLD#", "URI", "WORK_MANAGER")
                     create_report(report_title, report, column_names, is_sorted=True)
                 print("")
@@ -1324,10 +1282,11 @@ def main():
             elif procedure == "9":
                 break
             else:
-                log("ERROR", "Unknown procedure: '" + procedure + "'. Try again.")
+                log("ERROR", "Unknown procedure: '%s'. Try again.", procedure)
 
-        except (WLSTException, ValueError, NameError, Exception, AttributeError, EOFError), e:
+        except (WLSTException, Exception), e:
             log("ERROR", str(e))
+            f.flush()
             disconnect()
             is_connected = False
             connection_info["is_connected"] = is_connected
@@ -1338,13 +1297,31 @@ def main():
     exit()
 
 
+# Menu of the interactive mode, %s is the connection status
+MENU = "\n".join([
+    "",
+    "[0] Change environment (%s)",
+    "[1] List projects deployed on server",
+    "[2] List proxy services deployed on server",
+    "[3] List business services deployed on server",
+    "[4] Undeploy OSB projects",
+    "[5] Get project details",
+    "[6] Discard open OSB sessions",
+    "[7] Disable/Enable proxy services",
+    "[8] Disable/Enable proxy service monitoring",
+    "[9] Exit",
+    ""])
+
 # Create a four digit random id left padded with zeros for logging
 n = random.randint(1, 1000)
 ID = "id" + str("%04d" % n)
 
 # Name of the log file is derived from the name of the script
 log_file = sys.argv[0].replace("py", "log")
-f = open(log_file, "a")
+# The log file is only appended to, so use a 64 KiB buffer. It is flushed when f is closed or on error in main().
+f = open(log_file, "a", 65536)
+# Bound once, used by log() and log_report_lines()
+f_write = f.write
 print(cur_dt() + " [INFO] Output is sent to '" + log_file + "'. Log ID = '" + ID + "'")
 
 prop_env_file = get_env_prop_file()
@@ -1363,4 +1340,23 @@ url = ""
 username = ""
 password = ""
 
+# Extracts the first endpoint URI from a business service's SERVICE_URI_TABLE
+URI_RE = re.compile(r"<tran:URI>([^<]*)</tran:URI>")
+
+# Queries for all the proxy and business services. They are never modified, so they are shared by all calls.
+PROXY_SERVICES_QUERY = ResourceQuery('ProxyService')
+BUSINESS_SERVICES_QUERY = ResourceQuery('BusinessService')
+
+# MBeans found by find_mbean: {(name, type): mbean}
+mbean_cache = {}
+
+# Timestamp of the last session name created by new_session_name
+last_session_millis = 0
+
+# True if WLST is in the domainRuntime tree, see ensure_domain_runtime
+is_in_domain_runtime = False
+
+# JMS destinations by name, see get_jms_destinations
+jms_destinations = None
+
 main()